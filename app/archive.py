@@ -0,0 +1,258 @@
+import argparse
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from dotenv import load_dotenv
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+from .compression import (
+    CODEC_ZLIB,
+    available_codecs,
+    compress,
+    decode_transcript,
+    train_dictionary,
+)
+from .database import Base, SessionLocal, engine
+from .models import TranscriptDictionary, VoiceLog
+
+load_dotenv()
+
+ARCHIVE_AFTER_DAYS = int(os.getenv("TRANSCRIPT_ARCHIVE_AFTER_DAYS", "90"))
+# zlib unless zstd is asked for explicitly: every web worker must be able to
+# read what the job writes, and zstandard is not a required dependency
+ARCHIVE_CODEC = os.getenv("TRANSCRIPT_ARCHIVE_CODEC") or CODEC_ZLIB
+ARCHIVE_BATCH_SIZE = 500
+DICTIONARY_SAMPLE_SIZE = 2000
+
+# Columns added to voice_logs after the table was first created.
+# create_all() does not alter existing tables, so these are added in place.
+_ARCHIVE_COLUMNS = {
+    "transcript_archive": "BLOB",
+    "transcript_codec": "VARCHAR",
+    "transcript_dict_id": "INTEGER",
+}
+
+
+def _existing_columns(bind):
+    return {c["name"] for c in inspect(bind).get_columns(VoiceLog.__tablename__)}
+
+
+def ensure_archive_columns(bind=engine):
+    """
+    Idempotent, and safe to run from several processes at once (e.g.
+    uvicorn --workers N, where every worker imports app.main).
+    """
+    tables = Base.metadata.sorted_tables
+    for attempt in range(len(tables) + 1):
+        try:
+            Base.metadata.create_all(bind=bind)
+            break
+        except (OperationalError, ProgrammingError):
+            # Another process created a table between the existence check and
+            # CREATE; checkfirst skips it on the next pass
+            if attempt == len(tables):
+                raise
+
+    existing = _existing_columns(bind)
+    for name, sql_type in _ARCHIVE_COLUMNS.items():
+        if name in existing:
+            continue
+        if sql_type == "BLOB" and bind.dialect.name == "postgresql":
+            sql_type = "BYTEA"
+        try:
+            with bind.begin() as conn:
+                conn.execute(text(f"ALTER TABLE {VoiceLog.__tablename__} ADD COLUMN {name} {sql_type}"))
+        except (OperationalError, ProgrammingError):
+            # Lost the race to another process ("duplicate column"); anything
+            # else is a real failure
+            if name not in _existing_columns(bind):
+                raise
+
+
+@dataclass
+class ArchiveStats:
+    rows: int = 0
+    skipped: int = 0
+    raw_bytes: int = 0
+    stored_bytes: int = 0
+    dictionary_bytes: int = 0
+    seconds: float = 0.0
+
+    @property
+    def saved_bytes(self) -> int:
+        return self.raw_bytes - self.stored_bytes
+
+    @property
+    def ratio(self) -> float:
+        return self.raw_bytes / self.stored_bytes if self.stored_bytes else 0.0
+
+
+@dataclass
+class ReadOverhead:
+    rows: int = 0
+    bytes_out: int = 0
+    seconds: float = 0.0
+
+    @property
+    def us_per_row(self) -> float:
+        return self.seconds / self.rows * 1e6 if self.rows else 0.0
+
+    @property
+    def mb_per_s(self) -> float:
+        return self.bytes_out / self.seconds / 1e6 if self.seconds else 0.0
+
+
+def _get_dictionary(db, codec: str, cutoff: datetime) -> Optional[TranscriptDictionary]:
+    entry = (
+        db.query(TranscriptDictionary)
+        .filter(TranscriptDictionary.codec == codec)
+        .order_by(TranscriptDictionary.id.desc())
+        .first()
+    )
+    if entry:
+        return entry
+
+    samples = [
+        row.transcript_text
+        for row in db.query(VoiceLog.transcript_text)
+        .filter(VoiceLog.created_at < cutoff, VoiceLog.transcript_text.isnot(None))
+        .order_by(VoiceLog.id.desc())
+        .limit(DICTIONARY_SAMPLE_SIZE)
+    ]
+    data = train_dictionary(codec, samples)
+    if not data:
+        return None
+
+    entry = TranscriptDictionary(codec=codec, data=data)
+    db.add(entry)
+    db.commit()
+    db.refresh(entry)
+    return entry
+
+
+def compact_transcripts(
+    db,
+    older_than_days: int = ARCHIVE_AFTER_DAYS,
+    codec: str = ARCHIVE_CODEC,
+    use_dictionary: bool = False,
+    batch_size: int = ARCHIVE_BATCH_SIZE,
+) -> ArchiveStats:
+    """
+    Moves transcripts older than the cutoff from the plain text column into the
+    compressed archive column. Rows whose compressed form would not be smaller
+    are left as they are.
+    """
+    started = time.perf_counter()
+    stats = ArchiveStats()
+    cutoff = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+    # SQLite stores naive datetimes; comparing against an aware value would never match
+    if engine.dialect.name == "sqlite":
+        cutoff = cutoff.replace(tzinfo=None)
+
+    dictionary = _get_dictionary(db, codec, cutoff) if use_dictionary else None
+    dict_bytes = dictionary.data if dictionary else None
+    dict_id = dictionary.id if dictionary else None
+    stats.dictionary_bytes = len(dict_bytes) if dict_bytes else 0
+
+    last_id = 0
+    while True:
+        batch = (
+            db.query(VoiceLog)
+            .filter(
+                VoiceLog.id > last_id,
+                VoiceLog.created_at < cutoff,
+                VoiceLog.transcript_text.isnot(None),
+            )
+            .order_by(VoiceLog.id)
+            .limit(batch_size)
+            .all()
+        )
+        if not batch:
+            break
+
+        for log in batch:
+            raw = log.transcript_text.encode("utf-8")
+            packed = compress(log.transcript_text, codec, dict_bytes)
+            if len(packed) >= len(raw):
+                stats.skipped += 1
+                continue
+            log.transcript_archive = packed
+            log.transcript_codec = codec
+            log.transcript_dict_id = dict_id
+            log.transcript_text = None
+            stats.rows += 1
+            stats.raw_bytes += len(raw)
+            stats.stored_bytes += len(packed)
+
+        last_id = batch[-1].id
+        db.commit()
+        db.expunge_all()
+
+    stats.seconds = time.perf_counter() - started
+    return stats
+
+
+def measure_read_overhead(db, sample_size: int = 1000) -> ReadOverhead:
+    """
+    Times transparent decompression of archived transcripts, i.e. the extra cost
+    the read path pays for a cold row compared to a hot one.
+    """
+    rows = (
+        db.query(
+            VoiceLog.transcript_text,
+            VoiceLog.transcript_archive,
+            VoiceLog.transcript_codec,
+            VoiceLog.transcript_dict_id,
+        )
+        .filter(VoiceLog.transcript_archive.isnot(None))
+        .limit(sample_size)
+        .all()
+    )
+
+    result = ReadOverhead()
+    if rows:
+        # Warm the dictionary cache so only decompression is timed
+        decode_transcript(*rows[0])
+    started = time.perf_counter()
+    for row in rows:
+        result.bytes_out += len(decode_transcript(*row).encode("utf-8"))
+    result.seconds = time.perf_counter() - started
+    result.rows = len(rows)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compact old voice log transcripts into compressed cold storage.")
+    parser.add_argument("--older-than-days", type=int, default=ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--codec", choices=available_codecs(), default=ARCHIVE_CODEC)
+    parser.add_argument("--dictionary", action="store_true", help="compress with a shared dictionary trained from old transcripts")
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    ensure_archive_columns()
+    db = SessionLocal()
+    try:
+        stats = compact_transcripts(
+            db,
+            older_than_days=args.older_than_days,
+            codec=args.codec,
+            use_dictionary=args.dictionary,
+            batch_size=args.batch_size,
+        )
+        overhead = measure_read_overhead(db)
+    finally:
+        db.close()
+
+    print(f"Archived {stats.rows} transcripts with {args.codec} in {stats.seconds:.2f}s ({stats.skipped} skipped, not compressible).")
+    print(f"Space: {stats.raw_bytes} -> {stats.stored_bytes} bytes, saved {stats.saved_bytes} bytes (ratio {stats.ratio:.2f}x).")
+    if stats.dictionary_bytes:
+        print(f"Shared dictionary: {stats.dictionary_bytes} bytes (stored once, not included above).")
+    print(f"Read overhead: {overhead.us_per_row:.1f} us per archived transcript ({overhead.mb_per_s:.1f} MB/s over {overhead.rows} rows).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from sqlalchemy.exc import IntegrityError
+
+from .models import CacheVersion
+
+VOICE_LOGS = "voice_logs"
+
+
+def ensure_version_rows(db, names=(VOICE_LOGS,)):
+    """
+    Creates the version rows up front so bump_version() can be a plain UPDATE.
+    Several workers may race here on startup, which is harmless.
+    """
+    for name in names:
+        if db.get(CacheVersion, name) is None:
+            db.add(CacheVersion(name=name, version=0))
+            try:
+                db.commit()
+            except IntegrityError:
+                db.rollback()
+
+
+def get_version(db, name: str) -> int:
+    version = db.query(CacheVersion.version).filter(CacheVersion.name == name).scalar()
+    return version or 0
+
+
+def bump_version(db, name: str):
+    """
+    Increments the version in the caller's transaction, so it commits atomically
+    with the write it invalidates and every worker sees both or neither.
+    """
+    db.query(CacheVersion).filter(CacheVersion.name == name).update(
+        {CacheVersion.version: CacheVersion.version + 1}, synchronize_session=False
+    )
+
+
+class VersionedCache:
+    """
+    Per-process LRU of serialized response bodies, each tagged with the
+    database version it was built from. Entries from an older version are
+    treated as misses, so no cross-process invalidation message is needed.
+    """
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        # Sync routes run in the threadpool, so lookups and evictions interleave
+        self._lock = threading.Lock()
+
+    def get(self, key, version: int) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key, version: int, body: bytes):
+        with self._lock:
+            self._entries[key] = (version, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def make_etag(name: str, version: int, key) -> str:
+    # Derived only from the shared version, so it is identical across workers
+    return '"%s-%d-%s"' % (name, version, "-".join(str(k) for k in key))
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
@@ -0,0 +1,124 @@
+import threading
+import zlib
+from typing import Optional
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional; zlib is always available
+    zstandard = None
+
+CODEC_ZLIB = "zlib"
+CODEC_ZSTD = "zstd"
+
+ZLIB_LEVEL = 9
+ZSTD_LEVEL = 19
+# zlib only looks back 32KB, so a larger preset dictionary is wasted
+ZLIB_MAX_DICT_SIZE = 32 * 1024
+ZSTD_DICT_SIZE = 64 * 1024
+
+# Dictionaries are immutable once stored, so they can be cached for the process lifetime
+_dictionary_cache = {}
+# zstd decompressors per dictionary id, so a dictionary is digested once per
+# thread rather than once per row. Decompressors must not be shared between
+# threads, and sync routes run in a threadpool.
+_zstd_local = threading.local()
+
+
+def available_codecs():
+    return [CODEC_ZSTD, CODEC_ZLIB] if zstandard else [CODEC_ZLIB]
+
+
+def _require_codec(codec: str):
+    if codec not in (CODEC_ZLIB, CODEC_ZSTD):
+        raise ValueError(f"Unknown transcript codec: {codec}")
+    if codec == CODEC_ZSTD and zstandard is None:
+        raise RuntimeError("zstd codec requires the 'zstandard' package")
+
+
+def train_dictionary(codec: str, samples) -> Optional[bytes]:
+    """
+    Builds a shared dictionary from sample transcripts. Returns None when there
+    is not enough material to train one.
+    """
+    _require_codec(codec)
+    encoded = [s.encode("utf-8") for s in samples if s]
+    if not encoded:
+        return None
+
+    if codec == CODEC_ZSTD:
+        try:
+            return zstandard.train_dictionary(ZSTD_DICT_SIZE, encoded).as_bytes()
+        except zstandard.ZstdError:
+            return None
+
+    # zlib preset dictionaries favour content near the end, so keep the tail
+    return b"\n".join(encoded)[-ZLIB_MAX_DICT_SIZE:]
+
+
+def compress(text: str, codec: str, dictionary: Optional[bytes] = None) -> bytes:
+    _require_codec(codec)
+    data = text.encode("utf-8")
+
+    if codec == CODEC_ZSTD:
+        dict_data = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL, dict_data=dict_data).compress(data)
+
+    if dictionary:
+        c = zlib.compressobj(ZLIB_LEVEL, zlib.DEFLATED, zlib.MAX_WBITS, zdict=dictionary)
+    else:
+        c = zlib.compressobj(ZLIB_LEVEL)
+    return c.compress(data) + c.flush()
+
+
+def decompress(data: bytes, codec: str, dictionary: Optional[bytes] = None) -> str:
+    _require_codec(codec)
+
+    if codec == CODEC_ZSTD:
+        dict_data = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+        raw = zstandard.ZstdDecompressor(dict_data=dict_data).decompress(data)
+    elif dictionary:
+        d = zlib.decompressobj(zlib.MAX_WBITS, zdict=dictionary)
+        raw = d.decompress(data) + d.flush()
+    else:
+        raw = zlib.decompress(data)
+    return raw.decode("utf-8")
+
+
+def load_dictionary(dict_id: int) -> bytes:
+    if dict_id not in _dictionary_cache:
+        # Imported lazily: models depends on this module for transparent reads
+        from .database import SessionLocal
+        from .models import TranscriptDictionary
+
+        db = SessionLocal()
+        try:
+            entry = db.query(TranscriptDictionary).filter(TranscriptDictionary.id == dict_id).first()
+        finally:
+            db.close()
+        if entry is None:
+            raise LookupError(f"Transcript dictionary {dict_id} not found")
+        _dictionary_cache[dict_id] = entry.data
+    return _dictionary_cache[dict_id]
+
+
+def _zstd_decompressor(dict_id: Optional[int]):
+    cache = getattr(_zstd_local, "decompressors", None)
+    if cache is None:
+        cache = _zstd_local.decompressors = {}
+    if dict_id not in cache:
+        dict_data = zstandard.ZstdCompressionDict(load_dictionary(dict_id)) if dict_id is not None else None
+        cache[dict_id] = zstandard.ZstdDecompressor(dict_data=dict_data)
+    return cache[dict_id]
+
+
+def decode_transcript(text: Optional[str], archive: Optional[bytes], codec: Optional[str], dict_id: Optional[int]) -> Optional[str]:
+    """
+    Returns the transcript from whichever storage tier holds it.
+    """
+    if text is not None or archive is None:
+        return text
+    if codec == CODEC_ZSTD:
+        _require_codec(codec)
+        return _zstd_decompressor(dict_id).decompress(archive).decode("utf-8")
+    dictionary = load_dictionary(dict_id) if dict_id is not None else None
+    return decompress(archive, codec, dictionary)
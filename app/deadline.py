@@ -0,0 +1,279 @@
+import asyncio
+import atexit
+import os
+import threading
+import time
+from collections import Counter
+from typing import Optional
+
+from dotenv import load_dotenv
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from .database import SessionLocal
+from .models import CancellationCount
+
+load_dotenv()
+
+TIMEOUT_HEADER = "x-request-timeout"
+# Upper bound for client supplied timeouts, in seconds
+MAX_REQUEST_TIMEOUT = float(os.getenv("MAX_REQUEST_TIMEOUT", "120"))
+# How often each worker adds its cancellation counts to the database
+CANCELLATION_FLUSH_SECONDS = float(os.getenv("CANCELLATION_FLUSH_SECONDS", "5"))
+
+REASON_DEADLINE = "deadline"
+REASON_DISCONNECTED = "disconnected"
+
+
+class RequestCancelled(Exception):
+    def __init__(self, reason: str, stage: str):
+        super().__init__(f"Request cancelled ({reason}) before stage '{stage}'")
+        self.reason = reason
+        self.stage = stage
+
+
+class CancellationStats:
+    """
+    Counters of work abandoned through Deadline.check(). record() only touches
+    memory, so a cancellation never waits on the database; a background thread
+    adds the counts to cancellation_counts in batches, where the totals of
+    every worker process meet.
+    """
+
+    def __init__(self, session_factory=SessionLocal, interval: float = CANCELLATION_FLUSH_SECONDS):
+        self.session_factory = session_factory
+        self.interval = interval
+        self._reset()
+        # Counts and the flusher thread belong to one process; gunicorn forks
+        # workers from a preloaded master
+        os.register_at_fork(after_in_child=self._reset)
+        atexit.register(self.flush)
+
+    def _reset(self):
+        self._lock = threading.Lock()
+        self._pending = {}  # (reason, stage) -> [count, elapsed_seconds]
+        self._flusher = None
+
+    def _add_pending(self, key, count: int, elapsed: float):
+        entry = self._pending.setdefault(key, [0, 0.0])
+        entry[0] += count
+        entry[1] += elapsed
+
+    def record(self, reason: str, stage: str, elapsed: float):
+        with self._lock:
+            self._add_pending((reason, stage), 1, elapsed)
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_loop, name="cancellation-stats", daemon=True)
+                self._flusher.start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.interval)
+            self.flush()
+
+    def _increment(self, db, reason: str, stage: str, count: int, elapsed: float) -> bool:
+        updated = db.query(CancellationCount).filter(
+            CancellationCount.reason == reason, CancellationCount.stage == stage
+        ).update(
+            {
+                CancellationCount.count: CancellationCount.count + count,
+                CancellationCount.elapsed_seconds: CancellationCount.elapsed_seconds + elapsed,
+            },
+            synchronize_session=False,
+        )
+        return updated > 0
+
+    def _store(self, db, reason: str, stage: str, count: int, elapsed: float):
+        if not self._increment(db, reason, stage, count, elapsed):
+            db.add(CancellationCount(reason=reason, stage=stage, count=count, elapsed_seconds=elapsed))
+            try:
+                db.commit()
+                return
+            except IntegrityError:
+                # Another worker created the row first
+                db.rollback()
+                self._increment(db, reason, stage, count, elapsed)
+        db.commit()
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        db = self.session_factory()
+        try:
+            for (reason, stage), (count, elapsed) in pending.items():
+                try:
+                    self._store(db, reason, stage, count, elapsed)
+                except SQLAlchemyError:
+                    # Keep the counts for the next flush
+                    db.rollback()
+                    with self._lock:
+                        self._add_pending((reason, stage), count, elapsed)
+        finally:
+            db.close()
+
+    def snapshot(self, db) -> dict:
+        # Other workers' counts can lag by up to one flush interval
+        self.flush()
+        total = 0
+        elapsed = 0.0
+        by_reason = Counter()
+        by_stage = Counter()
+        for row in db.query(CancellationCount).all():
+            total += row.count
+            elapsed += row.elapsed_seconds
+            by_reason[row.reason] += row.count
+            by_stage[row.stage] += row.count
+        return {
+            "cancelled": total,
+            "by_reason": dict(by_reason),
+            "by_stage": dict(by_stage),
+            "elapsed_seconds": round(elapsed, 3),
+        }
+
+
+cancellation_stats = CancellationStats()
+
+
+class Deadline:
+    """
+    Cooperative cancellation token for one request. Handlers call check()
+    between pipeline stages; it raises RequestCancelled once the deadline has
+    passed or the client has gone away. Safe to use from the threadpool that
+    runs sync routes.
+    """
+
+    def __init__(self, timeout: Optional[float] = None):
+        self.started = time.monotonic()
+        self.expires_at = self.started + timeout if timeout is not None else None
+        self._disconnected = threading.Event()
+
+    def apply_default(self, timeout: Optional[float]):
+        # A timeout from the request header takes precedence over route defaults
+        if self.expires_at is None and timeout is not None:
+            self.expires_at = self.started + timeout
+
+    def disconnect(self):
+        self._disconnected.set()
+
+    @property
+    def disconnected(self) -> bool:
+        return self._disconnected.is_set()
+
+    def remaining(self) -> Optional[float]:
+        if self.expires_at is None:
+            return None
+        return self.expires_at - time.monotonic()
+
+    def check(self, stage: str):
+        if self.disconnected:
+            reason = REASON_DISCONNECTED
+        elif self.expires_at is not None and time.monotonic() >= self.expires_at:
+            reason = REASON_DEADLINE
+        else:
+            return
+        cancellation_stats.record(reason, stage, time.monotonic() - self.started)
+        raise RequestCancelled(reason, stage)
+
+
+def _header_timeout(scope) -> Optional[float]:
+    for key, value in scope.get("headers", []):
+        if key.decode("latin-1").lower() == TIMEOUT_HEADER:
+            try:
+                timeout = float(value)
+            except ValueError:
+                return None
+            return max(0.0, min(timeout, MAX_REQUEST_TIMEOUT))
+    return None
+
+
+def _has_body(scope) -> bool:
+    for key, value in scope.get("headers", []):
+        name = key.decode("latin-1").lower()
+        if name == "transfer-encoding" or (name == "content-length" and value.strip() not in (b"", b"0")):
+            return True
+    return False
+
+
+class DeadlineMiddleware:
+    """
+    Attaches a Deadline to request.state for paths under path_prefix and
+    watches the connection for the client going away.
+
+    The app reads the request body itself, so the server's flow control is
+    untouched. Once the body is complete (or straight away for body-less
+    requests) a watcher task takes over receive() and flags the Deadline as
+    soon as http.disconnect arrives, even while a sync handler is still busy
+    in the threadpool. Messages it reads reach the app through a one-slot
+    queue, so nothing is buffered beyond a single message.
+    """
+
+    def __init__(self, app, path_prefix: str = "/"):
+        self.app = app
+        self.path_prefix = path_prefix
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+
+        deadline = Deadline(_header_timeout(scope))
+        scope.setdefault("state", {})["deadline"] = deadline
+        queue = asyncio.Queue(maxsize=1)
+        watcher = None
+
+        async def watch():
+            while True:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    deadline.disconnect()
+                    await queue.put(message)
+                    return
+                # Only the empty body message of a body-less request gets here
+                await queue.put(message)
+
+        async def wrapped_receive():
+            nonlocal watcher
+            if watcher is None:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    deadline.disconnect()
+                elif not message.get("more_body", False):
+                    watcher = asyncio.create_task(watch())
+                return message
+            if deadline.disconnected and queue.empty():
+                return {"type": "http.disconnect"}
+            return await queue.get()
+
+        if not _has_body(scope):
+            watcher = asyncio.create_task(watch())
+        try:
+            await self.app(scope, wrapped_receive, send)
+        finally:
+            if watcher is not None:
+                watcher.cancel()
+
+
+def with_deadline(default_timeout: Optional[float] = None):
+    """
+    Dependency factory: returns the request's Deadline with the route's
+    default timeout applied when the client did not send one.
+    """
+
+    def dependency(request: Request) -> Deadline:
+        deadline = getattr(request.state, "deadline", None)
+        if deadline is None:
+            deadline = Deadline()
+            request.state.deadline = deadline
+        deadline.apply_default(default_timeout)
+        return deadline
+
+    return dependency
+
+
+async def request_cancelled_handler(request: Request, exc: RequestCancelled):
+    # 499 is the de facto "client closed request" code; nobody reads it anyway
+    status_code = 504 if exc.reason == REASON_DEADLINE else 499
+    return JSONResponse(status_code=status_code, content={"detail": str(exc)})
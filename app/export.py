@@ -0,0 +1,178 @@
+import argparse
+import csv
+import io
+import json
+import sys
+import zlib
+from datetime import datetime
+from typing import Iterator, Optional
+
+from .compression import decode_transcript
+from .database import SessionLocal
+from .models import VoiceLog
+
+EXPORT_FORMATS = ("csv", "ndjson")
+DEFAULT_CHUNK_SIZE = 1000
+
+# Column order for both CSV and NDJSON output
+EXPORT_COLUMNS = [
+    "id",
+    "uuid",
+    "elevenlabs_voice_id",
+    "client_name",
+    "audio_url",
+    "created_at",
+    "transcript",
+    "category",
+    "budget",
+    "timeline",
+]
+
+
+def _query_rows(db, created_from: Optional[datetime], created_to: Optional[datetime], chunk_size: int):
+    """
+    Plain column tuples (no ORM identity map) read through a server-side cursor,
+    fetched chunk_size rows at a time.
+    """
+    query = db.query(
+        VoiceLog.id,
+        VoiceLog.uuid,
+        VoiceLog.elevenlabs_voice_id,
+        VoiceLog.client_name,
+        VoiceLog.audio_url,
+        VoiceLog.created_at,
+        VoiceLog.transcript_text,
+        VoiceLog.transcript_archive,
+        VoiceLog.transcript_codec,
+        VoiceLog.transcript_dict_id,
+    )
+    if created_from is not None:
+        query = query.filter(VoiceLog.created_at >= created_from)
+    if created_to is not None:
+        query = query.filter(VoiceLog.created_at < created_to)
+    return query.order_by(VoiceLog.id).yield_per(chunk_size)
+
+
+def _to_record(row, generator) -> dict:
+    transcript = decode_transcript(
+        row.transcript_text, row.transcript_archive, row.transcript_codec, row.transcript_dict_id
+    )
+    record = {
+        "id": row.id,
+        "uuid": row.uuid,
+        "elevenlabs_voice_id": row.elevenlabs_voice_id,
+        "client_name": row.client_name,
+        "audio_url": row.audio_url,
+        "created_at": row.created_at.isoformat() if row.created_at else None,
+        "transcript": transcript,
+    }
+    record.update(generator.extract_fields(transcript or ""))
+    return record
+
+
+def _serialize_chunk(records, fmt: str, include_header: bool) -> str:
+    if fmt == "ndjson":
+        return "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records)
+
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=EXPORT_COLUMNS)
+    if include_header:
+        writer.writeheader()
+    writer.writerows(records)
+    return out.getvalue()
+
+
+def iter_export(
+    generator,
+    fmt: str = "csv",
+    gzip: bool = False,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """
+    Yields the voice log export as encoded byte chunks, one per chunk_size rows.
+    Only a single chunk is held in memory at a time, so memory stays flat
+    regardless of table size. Opens its own session so it can outlive the request
+    dependency when used as a StreamingResponse body.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    # wbits=31 -> gzip container, so output is a valid .gz stream
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if gzip else None
+
+    def emit(data: bytes) -> bytes:
+        return compressor.compress(data) if compressor else data
+
+    db = SessionLocal()
+    try:
+        header_pending = fmt == "csv"
+        records = []
+        for row in _query_rows(db, created_from, created_to, chunk_size):
+            records.append(_to_record(row, generator))
+            if len(records) >= chunk_size:
+                data = emit(_serialize_chunk(records, fmt, header_pending).encode("utf-8"))
+                header_pending = False
+                records = []
+                if data:
+                    yield data
+
+        if records or header_pending:
+            data = emit(_serialize_chunk(records, fmt, header_pending).encode("utf-8"))
+            if data:
+                yield data
+
+        if compressor:
+            yield compressor.flush()
+    finally:
+        db.close()
+
+
+def export_media_type(fmt: str, gzip: bool) -> str:
+    if gzip:
+        return "application/gzip"
+    return "text/csv; charset=utf-8" if fmt == "csv" else "application/x-ndjson"
+
+
+def export_filename(fmt: str, gzip: bool) -> str:
+    return f"voice_logs.{fmt}" + (".gz" if gzip else "")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream all voice logs to CSV or NDJSON.")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+    parser.add_argument("--gzip", action="store_true", help="gzip the output on the fly")
+    parser.add_argument("--created-from", type=datetime.fromisoformat, help="inclusive ISO datetime lower bound")
+    parser.add_argument("--created-to", type=datetime.fromisoformat, help="exclusive ISO datetime upper bound")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("-o", "--output", help="output file (defaults to stdout)")
+    args = parser.parse_args(argv)
+
+    # Imported here to avoid a cycle: the router itself imports this module
+    from .routers.voice_logs import generator
+    from .archive import ensure_archive_columns
+
+    # The CLI may run against a database the server has not migrated yet
+    ensure_archive_columns()
+
+    chunks = iter_export(
+        generator,
+        fmt=args.format,
+        gzip=args.gzip,
+        created_from=args.created_from,
+        created_to=args.created_to,
+        chunk_size=args.chunk_size,
+    )
+
+    out = open(args.output, "wb") if args.output else sys.stdout.buffer
+    try:
+        for chunk in chunks:
+            out.write(chunk)
+    finally:
+        if args.output:
+            out.close()
+
+
+if __name__ == "__main__":
+    main()
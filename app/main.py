@@ -1,16 +1,27 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse
-from .database import engine, Base
+from sqlalchemy.orm import Session
+from .database import engine, SessionLocal, get_db
+from .archive import ensure_archive_columns
+from .cache import ensure_version_rows
+from .deadline import DeadlineMiddleware, RequestCancelled, cancellation_stats, request_cancelled_handler
 from .routers import webhook, voice_logs
 from . import models
 import os
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
+# Create database tables (and add transcript archive columns to older databases)
+ensure_archive_columns(engine)
+
+with SessionLocal() as db:
+    ensure_version_rows(db)
 
 app = FastAPI()
 
+# Deadlines and client disconnect detection for proposal requests
+app.add_middleware(DeadlineMiddleware, path_prefix="/api/v1/voice_logs")
+app.add_exception_handler(RequestCancelled, request_cancelled_handler)
+
 # Include Routers
 app.include_router(webhook.router, prefix="/api/v1/webhook", tags=["webhook"])
 app.include_router(voice_logs.router, prefix="/api/v1/voice_logs", tags=["voice_logs"])
@@ -22,3 +33,8 @@ app.mount("/static", StaticFiles(directory="app/static"), name="static")
 @app.get("/")
 async def read_index():
     return FileResponse('app/static/index.html')
+
+# Work abandoned because of deadlines or disconnects, summed over all workers
+@app.get("/metrics/cancellations")
+def read_cancellations(db: Session = Depends(get_db)):
+    return cancellation_stats.snapshot(db)
@@ -1,6 +1,7 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text
+from sqlalchemy import Column, Integer, String, DateTime, Text, LargeBinary, ForeignKey, Float
 from sqlalchemy.sql import func
 from .database import Base
+from .compression import decode_transcript
 import uuid
 
 class VoiceLog(Base):
@@ -9,7 +10,53 @@ class VoiceLog(Base):
     id = Column(Integer, primary_key=True, index=True)
     uuid = Column(String, unique=True, index=True, default=lambda: str(uuid.uuid4()))
     elevenlabs_voice_id = Column(String, index=True)
-    transcript = Column(Text)
+    # Hot tier: plain text. Cleared once the archive job moves it to transcript_archive.
+    transcript_text = Column("transcript", Text)
+    # Cold tier: compressed transcript (see app/archive.py)
+    transcript_archive = Column(LargeBinary, nullable=True)
+    transcript_codec = Column(String, nullable=True)
+    transcript_dict_id = Column(Integer, ForeignKey("transcript_dictionaries.id"), nullable=True)
     audio_url = Column(String)
     client_name = Column(String, default="Client")
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    @property
+    def transcript(self):
+        return decode_transcript(
+            self.transcript_text,
+            self.transcript_archive,
+            self.transcript_codec,
+            self.transcript_dict_id,
+        )
+
+    @transcript.setter
+    def transcript(self, value):
+        self.transcript_text = value
+        self.transcript_archive = None
+        self.transcript_codec = None
+        self.transcript_dict_id = None
+
+
+class TranscriptDictionary(Base):
+    __tablename__ = "transcript_dictionaries"
+
+    id = Column(Integer, primary_key=True, index=True)
+    codec = Column(String, nullable=False)
+    data = Column(LargeBinary, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class CacheVersion(Base):
+    __tablename__ = "cache_versions"
+
+    name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+
+class CancellationCount(Base):
+    __tablename__ = "cancellation_counts"
+
+    reason = Column(String, primary_key=True)
+    stage = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+    elapsed_seconds = Column(Float, nullable=False, default=0.0)
@@ -6,6 +6,8 @@ from reportlab.platypus import BaseDocTemplate, PageTemplate, Frame, Paragraph,
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.graphics.shapes import Drawing, Rect, Path
 from reportlab.lib.colors import HexColor
+from reportlab.pdfgen.canvas import Canvas
+from reportlab.pdfbase.pdfdoc import PDFZCompress
 import re
 
 # --- Design Constants ---
@@ -15,6 +17,24 @@ COLOR_TEXT_WHITE = HexColor("#FFFFFF")
 COLOR_TEXT_DARK = HexColor("#333333")
 COLOR_LIGHT_BG = HexColor("#F5F7FA")
 
+# --- Output Modes ---
+class _CompactCanvas(Canvas):
+    """
+    Writes page and form streams as binary Flate. ReportLab's own page
+    compression also wraps them in ASCII85, which makes them ~25% larger, and
+    its switch for that (rl_config.useA85) is process-wide. Instead the
+    document is built with pageCompression=0, so streams carry no filters of
+    their own and fall back to this document's default filters.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._doc.defaultStreamFilters = [PDFZCompress]
+
+# Name of the form XObject used by the compact output mode. The cover is drawn
+# only once per document, so it stays inline: a form would only add overhead.
+FORM_CONTENT = "ContentBackground"
+
 def draw_cover_background(canvas, doc):
     """
     Draws the geometric blue background for the cover page.
@@ -76,11 +96,10 @@ def draw_cover_background(canvas, doc):
 
     canvas.restoreState()
 
-def draw_content_background(canvas, doc):
+def _draw_content_static(canvas):
     """
-    Draws the background for normal content pages.
+    Parts of the content page background shared by every page.
     """
-    canvas.saveState()
     w, h = A4
     
     # 1. Top Blue Accent
@@ -97,20 +116,66 @@ def draw_content_background(canvas, doc):
     canvas.setFillColor(COLOR_PRIMARY)
     canvas.rect(w - 20*mm, 10*mm, 20*mm, 15*mm, fill=1, stroke=0)
     
-    canvas.setFillColor(COLOR_TEXT_WHITE)
-    canvas.setFont("Helvetica-Bold", 12)
-    canvas.drawCentredString(w - 10*mm, 15*mm, str(doc.page))
-    
     # 3. Footer URL
     canvas.setFillColor(COLOR_TEXT_DARK)
     canvas.setFont("Helvetica", 9)
     canvas.drawString(20*mm, 15*mm, "www.antigravity.com")
 
+def _draw_content_dynamic(canvas, doc):
+    """
+    Page number, drawn on top of the page number box.
+    """
+    w, h = A4
+    canvas.setFillColor(COLOR_TEXT_WHITE)
+    canvas.setFont("Helvetica-Bold", 12)
+    canvas.drawCentredString(w - 10*mm, 15*mm, str(doc.page))
+
+def _draw_form(canvas, name, draw_static):
+    """
+    Defines the form XObject on first use and references it afterwards, so its
+    drawing operators are written to the file only once.
+    """
+    if not canvas.hasForm(name):
+        canvas.beginForm(name)
+        canvas.saveState()
+        draw_static(canvas)
+        canvas.restoreState()
+        canvas.endForm()
+    canvas.doForm(name)
+
+def draw_content_background(canvas, doc):
+    """
+    Draws the background for normal content pages.
+    """
+    canvas.saveState()
+    _draw_content_static(canvas)
+    _draw_content_dynamic(canvas, doc)
+    canvas.restoreState()
+
+def draw_content_background_compact(canvas, doc):
+    """
+    Compact mode: every content page references one form XObject and only
+    draws its own page number.
+    """
+    canvas.saveState()
+    _draw_form(canvas, FORM_CONTENT, _draw_content_static)
+    _draw_content_dynamic(canvas, doc)
     canvas.restoreState()
 
-def generate_pdf(context):
+def generate_pdf(context, compact=False, deadline=None):
+    """
+    Renders the proposal PDF. compact=True enables binary (non-ASCII85) stream
+    compression and draws the repeated page decorations once as shared form
+    XObjects, for smaller files (e.g. email attachments). If a deadline is
+    given it is checked after every page, so abandoned renders stop early.
+    """
     buffer = BytesIO()
-    doc = BaseDocTemplate(buffer, pagesize=A4, rightMargin=20*mm, leftMargin=20*mm, topMargin=20*mm, bottomMargin=30*mm)
+    doc = BaseDocTemplate(
+        buffer, pagesize=A4, rightMargin=20*mm, leftMargin=20*mm, topMargin=20*mm, bottomMargin=30*mm,
+        # None keeps ReportLab's configured default for the standard mode;
+        # compact mode compresses through _CompactCanvas instead
+        pageCompression=0 if compact else None
+    )
     
     # Store metadata on doc for callbacks
     doc.doc_date = context.get("date", "")
@@ -124,8 +189,9 @@ def generate_pdf(context):
     frame_content = Frame(doc.leftMargin, doc.bottomMargin, doc.width, doc.height, id='content', showBoundary=0)
     
     # --- Page Templates ---
+    on_content = draw_content_background_compact if compact else draw_content_background
     template_cover = PageTemplate(id='Cover', frames=[frame_cover], onPage=draw_cover_background)
-    template_content = PageTemplate(id='Content', frames=[frame_content], onPage=draw_content_background)
+    template_content = PageTemplate(id='Content', frames=[frame_content], onPage=on_content)
     
     doc.addPageTemplates([template_cover, template_content])
     
@@ -247,6 +313,9 @@ def generate_pdf(context):
     ]))
     story.append(t)
     
-    doc.build(story)
+    if deadline is not None:
+        doc.afterPage = lambda: deadline.check("render")
+    
+    doc.build(story, canvasmaker=_CompactCanvas if compact else Canvas)
     buffer.seek(0)
     return buffer
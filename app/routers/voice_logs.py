@@ -1,13 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, Request
-from fastapi.responses import HTMLResponse, StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import HTMLResponse, StreamingResponse, Response
 from fastapi.templating import Jinja2Templates
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 from sqlalchemy.orm import Session
 from typing import List, Dict, Optional
 from ..database import get_db
+from ..dependencies import verify_api_key
 from ..models import VoiceLog
 from ..schemas import VoiceLogRead
 from ..pdf_generator import generate_pdf
+from ..deadline import Deadline, with_deadline
+from ..cache import VOICE_LOGS, VersionedCache, get_version, bump_version, make_etag, etag_matches
+from ..export import EXPORT_FORMATS, DEFAULT_CHUNK_SIZE, iter_export, export_media_type, export_filename
 import re
 from datetime import datetime
 import markdown
@@ -15,6 +19,11 @@ import markdown
 router = APIRouter()
 templates = Jinja2Templates(directory="app/templates")
 
+# Default per-route deadlines in seconds; clients may send X-Request-Timeout instead
+LIST_TIMEOUT = 10
+PROPOSAL_TIMEOUT = 15
+PDF_TIMEOUT = 30
+
 class ProposalGenerator:
     def generate(self, transcript: str, voice_id: str) -> str:
         transcript_lower = transcript.lower()
@@ -31,6 +40,13 @@ class ProposalGenerator:
         )
         return proposal
 
+    def extract_fields(self, transcript: str) -> Dict[str, str]:
+        return {
+            "category": self._identify_category(transcript.lower()),
+            "budget": self._extract_budget(transcript),
+            "timeline": self._extract_timeline(transcript),
+        }
+
     def _extract_budget(self, text: str) -> str:
         match = re.search(r'\$(\d+(?:,\d+)*(?:k|K|m|M)?)', text)
         if match: return match.group(0)
@@ -176,28 +192,91 @@ We bring expertise, transparency, and a results-driven approach to every project
 
 generator = ProposalGenerator()
 
+# Serialized list pages, invalidated by the voice_logs version bumped on every insert
+list_cache = VersionedCache()
+voice_log_list_adapter = TypeAdapter(List[VoiceLogRead])
+
 @router.get("/", response_model=List[VoiceLogRead])
-def read_voice_logs(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    logs = db.query(VoiceLog).order_by(VoiceLog.created_at.desc()).offset(skip).limit(limit).all()
-    return logs
+def read_voice_logs(
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_db),
+    deadline: Deadline = Depends(with_deadline(LIST_TIMEOUT)),
+):
+    # Read the version before the rows: a concurrent insert can then only make
+    # the cached page newer than its version, never older
+    version = get_version(db, VOICE_LOGS)
+    key = (skip, limit)
+    etag = make_etag(VOICE_LOGS, version, key)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    body = list_cache.get(key, version)
+    if body is None:
+        deadline.check("db")
+        logs = db.query(VoiceLog).order_by(VoiceLog.created_at.desc()).offset(skip).limit(limit).all()
+        body = voice_log_list_adapter.dump_json(voice_log_list_adapter.validate_python(logs, from_attributes=True))
+        list_cache.put(key, version, body)
+
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@router.get("/export")
+def export_voice_logs(
+    format: str = Query("csv", pattern=f"^({'|'.join(EXPORT_FORMATS)})$"),
+    gzip: bool = False,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    chunk_size: int = Query(DEFAULT_CHUNK_SIZE, ge=1, le=50000),
+    api_key: str = Depends(verify_api_key),
+):
+    chunks = iter_export(
+        generator,
+        fmt=format,
+        gzip=gzip,
+        created_from=created_from,
+        created_to=created_to,
+        chunk_size=chunk_size,
+    )
+    return StreamingResponse(
+        chunks,
+        media_type=export_media_type(format, gzip),
+        headers={"Content-Disposition": f"attachment; filename={export_filename(format, gzip)}"}
+    )
 
 @router.get("/{voice_log_id}/proposal")
-def generate_proposal(voice_log_id: int, db: Session = Depends(get_db)):
+def generate_proposal(
+    voice_log_id: int,
+    db: Session = Depends(get_db),
+    deadline: Deadline = Depends(with_deadline(PROPOSAL_TIMEOUT)),
+):
+    deadline.check("db")
     log = db.query(VoiceLog).filter(VoiceLog.id == voice_log_id).first()
     if not log:
         raise HTTPException(status_code=404, detail="Voice log not found")
     
+    deadline.check("generation")
     proposal_text = generator.generate(log.transcript, log.elevenlabs_voice_id)
     return {"id": log.id, "voice_id": log.elevenlabs_voice_id, "proposal": proposal_text}
 
 @router.get("/proposal/{uuid}", response_class=HTMLResponse)
-def view_proposal_html(request: Request, uuid: str, db: Session = Depends(get_db)):
+def view_proposal_html(
+    request: Request,
+    uuid: str,
+    db: Session = Depends(get_db),
+    deadline: Deadline = Depends(with_deadline(PROPOSAL_TIMEOUT)),
+):
+    deadline.check("db")
     log = db.query(VoiceLog).filter(VoiceLog.uuid == uuid).first()
     if not log:
         raise HTTPException(status_code=404, detail="Proposal not found")
     
+    deadline.check("generation")
     proposal_md = generator.generate(log.transcript, log.elevenlabs_voice_id)
     
+    deadline.check("markdown")
     context = {
         "client_name": log.client_name or "Valued Client",
         "date": datetime.now().strftime("%B %d, %Y"),
@@ -205,6 +284,7 @@ def view_proposal_html(request: Request, uuid: str, db: Session = Depends(get_db
         "proposal_html": markdown.markdown(proposal_md)
     }
     
+    deadline.check("render")
     return templates.TemplateResponse("proposal_preview.html", {"request": request, "context": context})
     
 
@@ -217,8 +297,22 @@ class ProposalRequest(BaseModel):
     client_main_problem: Optional[str] = None
 
 @router.post("/generate")
-def generate_proposal_stateless(data: ProposalRequest, request: Request, db: Session = Depends(get_db)):
-    # 1. Save to Database to create a persistent ID
+def generate_proposal_stateless(
+    data: ProposalRequest,
+    request: Request,
+    db: Session = Depends(get_db),
+    deadline: Deadline = Depends(with_deadline(PROPOSAL_TIMEOUT)),
+):
+    # 1. Generate content
+    deadline.check("generation")
+    proposal_text = generator.generate(data.transcript, data.elevenlabs_voice_id)
+    deadline.check("markdown")
+    proposal_html = markdown.markdown(proposal_text)
+
+    # 2. Save to Database to create a persistent ID
+    # Last cancellation point: once the row is committed the request must
+    # succeed, or clients retrying on 504 would store duplicate logs
+    deadline.check("db")
     new_log = VoiceLog(
         elevenlabs_voice_id=data.elevenlabs_voice_id,
         transcript=data.transcript,
@@ -226,12 +320,9 @@ def generate_proposal_stateless(data: ProposalRequest, request: Request, db: Ses
         audio_url="" # No audio URL allowed/needed for text-only gen?
     )
     db.add(new_log)
+    bump_version(db, VOICE_LOGS)
     db.commit()
     db.refresh(new_log)
-
-    # 2. Generate content
-    proposal_text = generator.generate(data.transcript, data.elevenlabs_voice_id)
-    proposal_html = markdown.markdown(proposal_text)
     
     # 3. Generate Secure Link using UUID
     # Force HTTPS for Render
@@ -256,8 +347,14 @@ def generate_proposal_stateless(data: ProposalRequest, request: Request, db: Ses
     }
 
 @router.post("/generate/pdf")
-def generate_proposal_pdf_stateless(data: ProposalRequest, request: Request):
+def generate_proposal_pdf_stateless(
+    data: ProposalRequest,
+    request: Request,
+    compact: bool = False,
+    deadline: Deadline = Depends(with_deadline(PDF_TIMEOUT)),
+):
     # 1. Generate text
+    deadline.check("generation")
     proposal_text = generator.generate(data.transcript, data.elevenlabs_voice_id)
     
     # 2. Prepare context for PDF
@@ -268,8 +365,9 @@ def generate_proposal_pdf_stateless(data: ProposalRequest, request: Request):
         # Can add other fields if we want to show them on PDF
     }
     
-    # 3. Generate PDF
-    pdf_buffer = generate_pdf(context)
+    # 3. Generate PDF (also checks the deadline after every page)
+    deadline.check("render")
+    pdf_buffer = generate_pdf(context, compact=compact, deadline=deadline)
     
     # 4. Return as stream
     filename = f"Proposal_{data.client_name or 'Client'}.pdf"
@@ -281,11 +379,17 @@ def generate_proposal_pdf_stateless(data: ProposalRequest, request: Request):
     )
 
 @router.post("/generate/html", response_class=HTMLResponse)
-def generate_proposal_html_stateless(data: ProposalRequest, request: Request):
+def generate_proposal_html_stateless(
+    data: ProposalRequest,
+    request: Request,
+    deadline: Deadline = Depends(with_deadline(PROPOSAL_TIMEOUT)),
+):
     # 1. Generate text
+    deadline.check("generation")
     proposal_text = generator.generate(data.transcript, data.elevenlabs_voice_id)
     
     # 2. Convert to HTML fragment for embedding
+    deadline.check("markdown")
     proposal_content_html = markdown.markdown(proposal_text)
     
     # 3. Prepare context
@@ -297,4 +401,5 @@ def generate_proposal_html_stateless(data: ProposalRequest, request: Request):
         "proposal_html": proposal_content_html
     }
     
+    deadline.check("render")
     return templates.TemplateResponse("proposal_preview.html", {"request": request, "context": context})
@@ -4,6 +4,7 @@ from ..database import get_db
 from ..models import VoiceLog
 from ..schemas import VoiceLogCreate
 from ..dependencies import verify_api_key
+from ..cache import VOICE_LOGS, bump_version
 
 router = APIRouter()
 
@@ -23,6 +24,7 @@ def create_voice_log(
     db_voice_log = VoiceLog(**data)
     
     db.add(db_voice_log)
+    bump_version(db, VOICE_LOGS)
     db.commit()
     db.refresh(db_voice_log)
     
@@ -1,6 +1,7 @@
 from sqlalchemy.orm import Session
 from app.database import SessionLocal
 from app.models import VoiceLog
+from app.cache import VOICE_LOGS, bump_version
 import random
 import uuid
 from datetime import datetime, timedelta
@@ -48,6 +49,7 @@ def seed():
         )
         db.add(log)
     
+    bump_version(db, VOICE_LOGS)
     db.commit()
     print("Seeding complete. Added 5 records.")
     db.close()
@@ -0,0 +1,146 @@
+"""
+Production entry point: gunicorn with uvicorn workers.
+
+    python -m app.serve
+
+The app is imported and warmed in the master before forking, so workers share
+its memory copy-on-write. Worker count is sized from the CPUs and memory
+actually available to the container unless WEB_CONCURRENCY is set.
+"""
+import os
+
+from dotenv import load_dotenv
+from gunicorn.app.base import BaseApplication
+
+load_dotenv()
+
+# Rough steady-state RSS of one worker after rendering PDFs
+WORKER_MEMORY_MB = int(os.getenv("WORKER_MEMORY_MB", "150"))
+# Memory kept free for the master process and the OS
+RESERVED_MEMORY_MB = int(os.getenv("RESERVED_MEMORY_MB", "128"))
+MAX_REQUESTS = int(os.getenv("MAX_REQUESTS", "1000"))
+MAX_REQUESTS_JITTER = int(os.getenv("MAX_REQUESTS_JITTER", "100"))
+GRACEFUL_TIMEOUT = int(os.getenv("GRACEFUL_TIMEOUT", "30"))
+WORKER_TIMEOUT = int(os.getenv("WORKER_TIMEOUT", "60"))
+
+
+def _read(path):
+    try:
+        with open(path) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def available_cpus() -> int:
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:
+        cpus = os.cpu_count() or 1
+
+    # cgroup v2 CPU quota, e.g. "200000 100000" for 2 CPUs
+    quota = _read("/sys/fs/cgroup/cpu.max")
+    if quota and not quota.startswith("max"):
+        limit, period = quota.split()
+        cpus = min(cpus, max(1, int(limit) // int(period)))
+    else:
+        # cgroup v1: a quota of -1 means unlimited
+        limit = _read("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") or _read("/sys/fs/cgroup/cpu,cpuacct/cpu.cfs_quota_us")
+        period = _read("/sys/fs/cgroup/cpu/cpu.cfs_period_us") or _read("/sys/fs/cgroup/cpu,cpuacct/cpu.cfs_period_us")
+        if limit and period and limit.isdigit() and period.isdigit() and int(period) > 0:
+            cpus = min(cpus, max(1, int(limit) // int(period)))
+    return max(1, cpus)
+
+
+def available_memory_mb() -> int:
+    limits = []
+
+    # cgroup v2, then v1
+    for path in ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes"):
+        value = _read(path)
+        if value and value.isdigit():
+            limits.append(int(value) // (1024 * 1024))
+
+    meminfo = _read("/proc/meminfo")
+    if meminfo:
+        for line in meminfo.splitlines():
+            if line.startswith("MemAvailable:"):
+                limits.append(int(line.split()[1]) // 1024)
+
+    return min(limits) if limits else 0
+
+
+def default_workers() -> int:
+    # PDF rendering is CPU-bound, so more workers than cores only adds contention
+    by_cpu = available_cpus()
+    memory = available_memory_mb()
+    if not memory:
+        return by_cpu
+    by_memory = max(1, (memory - RESERVED_MEMORY_MB) // WORKER_MEMORY_MB)
+    return max(1, min(by_cpu, by_memory))
+
+
+def warm_up(app):
+    """
+    Loads everything the first request would otherwise pay for, in the master,
+    so the pages end up shared by all workers.
+    """
+    from .database import engine
+    from .pdf_generator import generate_pdf
+    from .routers.voice_logs import generator, templates
+
+    templates.get_template("proposal_preview.html")
+    proposal = generator.generate("AI chatbot, budget $10k, 4 weeks", "warmup")
+    generate_pdf({"date": "", "client_name": "Warmup", "proposal_markdown": proposal})
+
+    # Connections opened during startup must not be inherited by the workers
+    engine.dispose()
+    return app
+
+
+def post_fork(server, worker):
+    from .database import engine
+
+    # Drop any pooled connections copied from the master without closing them
+    # under the other processes' feet
+    engine.dispose(close=False)
+
+
+class ServeApplication(BaseApplication):
+    def __init__(self, options):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from .main import app
+
+        return warm_up(app)
+
+
+def build_options():
+    return {
+        "bind": f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '8000')}",
+        "workers": int(os.getenv("WEB_CONCURRENCY") or default_workers()),
+        "worker_class": "uvicorn.workers.UvicornWorker",
+        "preload_app": True,
+        "max_requests": MAX_REQUESTS,
+        "max_requests_jitter": MAX_REQUESTS_JITTER,
+        "graceful_timeout": GRACEFUL_TIMEOUT,
+        "timeout": WORKER_TIMEOUT,
+        "post_fork": post_fork,
+        "accesslog": os.getenv("ACCESS_LOG") or None,
+    }
+
+
+def main():
+    options = build_options()
+    print(f"Starting {options['workers']} worker(s) on {options['bind']}")
+    ServeApplication(options).run()
+
+
+if __name__ == "__main__":
+    main()
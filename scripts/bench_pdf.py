@@ -0,0 +1,81 @@
+"""
+PDF size and render time per output mode.
+
+Renders the same proposals with generate_pdf in the standard and compact
+modes and reports document size and render time for each.
+
+Examples:
+    python scripts/bench_pdf.py
+    python scripts/bench_pdf.py --iterations 200 --pages 12 --json pdf.json
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from app.pdf_generator import generate_pdf  # noqa: E402
+from app.routers.voice_logs import generator  # noqa: E402
+
+MODES = {"standard": False, "compact": True}
+
+TRANSCRIPT = "Client needs an AI chatbot with RAG over their docs. Budget is $40k, timeline 3 months."
+
+
+def build_context(pages):
+    proposal = generator.generate(TRANSCRIPT, "bench")
+    # Repeat the body to produce longer documents, where per-page decorations add up
+    body = "\n".join([proposal] * max(1, pages))
+    return {"date": "January 01, 2026", "client_name": "Bench Client", "proposal_markdown": body}
+
+
+def bench_mode(context, compact, iterations):
+    sizes = []
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        pdf = generate_pdf(context, compact=compact).getvalue()
+        timings.append(time.perf_counter() - started)
+        sizes.append(len(pdf))
+    return {
+        "bytes": sizes[-1],
+        "mean_ms": statistics.mean(timings) * 1000,
+        "p50_ms": statistics.median(timings) * 1000,
+        "min_ms": min(timings) * 1000,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark PDF size and render time per output mode.")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 4, 12], help="proposal body repetitions")
+    parser.add_argument("--json", help="write results as JSON to this path")
+    args = parser.parse_args(argv)
+
+    # Warm up fonts and module caches so the first mode is not penalised
+    generate_pdf(build_context(1))
+
+    results = []
+    print(f"{'body':>5} {'mode':<9} {'bytes':>9} {'vs std':>7} {'mean ms':>9} {'p50 ms':>9}")
+    for pages in args.pages:
+        context = build_context(pages)
+        baseline = None
+        for mode, compact in MODES.items():
+            r = bench_mode(context, compact, args.iterations)
+            r.update({"body_repeats": pages, "mode": mode})
+            results.append(r)
+            baseline = baseline or r["bytes"]
+            print(f"{pages:>5} {mode:<9} {r['bytes']:>9} {r['bytes'] / baseline:>6.0%} {r['mean_ms']:>9.2f} {r['p50_ms']:>9.2f}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Wrote JSON results to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
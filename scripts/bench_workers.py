@@ -0,0 +1,92 @@
+"""
+Throughput scaling benchmark for the production serving mode.
+
+Starts `python -m app.serve` with 1..N workers and drives each with the same
+closed-loop load from scripts/loadtest.py, then prints throughput and p95
+latency per worker count together with the speedup over a single worker.
+
+Examples:
+    python scripts/bench_workers.py --max-workers 4 --duration 20
+    python scripts/bench_workers.py --workers 1,2,4,8 --mix pdf=1 --json scaling.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+
+from loadtest import DEFAULT_MIX, LOADTEST_API_KEY, LoadTest, parse_mix, start_server
+
+
+def run_once(workers, args):
+    db_dir = tempfile.mkdtemp(prefix="bench-workers-")
+    proc, base_url = start_server(workers, db_dir, serve=True)
+    try:
+        def load(duration):
+            test = LoadTest(
+                base_url,
+                args.mix,
+                concurrency=args.concurrency,
+                rate=None,
+                duration=duration,
+                total=None,
+                timeout=args.timeout,
+                seed=args.seed,
+                api_key=LOADTEST_API_KEY,
+            )
+            return asyncio.run(test.run())
+
+        # Let every worker take its first requests before measuring
+        load(args.warmup)
+        return load(args.duration)
+    finally:
+        proc.terminate()
+        proc.wait(timeout=60)
+        shutil.rmtree(db_dir, ignore_errors=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark throughput scaling across worker counts.")
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--workers", help="explicit comma separated worker counts (overrides --max-workers)")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX))
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--warmup", type=float, default=3.0)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write all results as JSON to this path")
+    args = parser.parse_args(argv)
+
+    if args.workers:
+        counts = [int(w) for w in args.workers.split(",")]
+    else:
+        counts = sorted({1, *[2 ** i for i in range(1, 8) if 2 ** i < args.max_workers], args.max_workers})
+
+    results = []
+    for workers in counts:
+        report = run_once(workers, args)
+        report["workers"] = workers
+        results.append(report)
+        total = report["total"]
+        print(f"workers={workers}: {total['throughput_rps']:.1f} req/s, p95 {total['p95_ms']:.1f} ms, errors {total['errors']}")
+
+    base = results[0]["total"]["throughput_rps"] or 1.0
+    print()
+    print(f"{'workers':>7} {'req/s':>9} {'speedup':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'err%':>6}")
+    for r in results:
+        t = r["total"]
+        print(
+            f"{r['workers']:>7} {t['throughput_rps']:>9.1f} {t['throughput_rps'] / base:>7.2f}x "
+            f"{t['p50_ms']:>9.1f} {t['p95_ms']:>9.1f} {t['p99_ms']:>9.1f} {t['error_rate'] * 100:>5.1f}%"
+        )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Wrote JSON results to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
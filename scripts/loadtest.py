@@ -0,0 +1,400 @@
+"""
+Offline load generator for the API.
+
+Starts a local uvicorn (against a throwaway SQLite database) unless --base-url
+is given, replays a weighted mix of endpoint calls with asyncio, and reports
+throughput, error rate and p50/p95/p99 latency per endpoint.
+
+Examples:
+    python scripts/loadtest.py --concurrency 16 --duration 30
+    python scripts/loadtest.py --rate 50 --duration 60 --workers 4 --json load.json
+    python scripts/loadtest.py --mix list=8,webhook=2,pdf=1 --base-url http://127.0.0.1:8000
+"""
+import argparse
+import asyncio
+import http.client
+import itertools
+import json
+import math
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from urllib.parse import urlsplit
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LOADTEST_API_KEY = "loadtest-key"
+
+DEFAULT_MIX = "webhook=4,list=10,generate=3,html=3,pdf=1"
+
+TRANSCRIPTS = [
+    "Client needs an AI chatbot for L1 support with RAG over their docs. Budget is $40k, timeline 3 months.",
+    "Mobile app for iOS and Android with loyalty points and gamified onboarding. Needs delivery in Q2.",
+    "Legacy CRM and ERP overhaul with email marketing integration. Budget around $120k. Timeline 6 months.",
+    "Web scraping dashboard to monitor competitor prices daily, exported to CSV. 8 weeks.",
+    "Healthcare patient portal with appointment scheduling and tele-consultation, HIPAA compliant.",
+]
+
+# name -> (method, path, needs api key, body factory)
+ENDPOINTS = {
+    "webhook": ("POST", "/api/v1/webhook/n8n", True, lambda t: {
+        "elevenlabs_voice_id": "loadtest_voice",
+        "transcript": t,
+        "audio_url": "https://example.com/audio.mp3",
+    }),
+    "list": ("GET", "/api/v1/voice_logs/", False, None),
+    "generate": ("POST", "/api/v1/voice_logs/generate", False, lambda t: {"transcript": t, "client_name": "Load Test"}),
+    "html": ("POST", "/api/v1/voice_logs/generate/html", False, lambda t: {"transcript": t, "client_name": "Load Test"}),
+    "pdf": ("POST", "/api/v1/voice_logs/generate/pdf", False, lambda t: {"transcript": t, "client_name": "Load Test"}),
+}
+
+
+class Connection:
+    """
+    Minimal keep-alive HTTP/1.1 client on asyncio streams, so the harness needs
+    nothing beyond the standard library.
+    """
+
+    def __init__(self, host, port, timeout):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.reader = None
+        self.writer = None
+
+    async def _connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    def close(self):
+        if self.writer:
+            self.writer.close()
+        self.reader = self.writer = None
+
+    async def request(self, method, path, body=None, headers=None):
+        return await asyncio.wait_for(self._request(method, path, body, headers or {}), self.timeout)
+
+    async def _request(self, method, path, body, headers):
+        reused = self.writer is not None
+        if not reused:
+            await self._connect()
+        try:
+            return await self._exchange(method, path, body, headers)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            if not reused:
+                raise
+            # The server may close an idle or failed keep-alive connection
+            # between requests; retry once on a fresh one like any HTTP client.
+            self.close()
+            await self._connect()
+            return await self._exchange(method, path, body, headers)
+
+    async def _exchange(self, method, path, body, headers):
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}:{self.port}"]
+        for k, v in headers.items():
+            lines.append(f"{k}: {v}")
+        payload = body or b""
+        lines.append(f"Content-Length: {len(payload)}")
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + payload)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("connection closed by server")
+        status = int(status_line.split()[1])
+
+        resp_headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            k, _, v = line.decode("latin-1").partition(":")
+            resp_headers[k.strip().lower()] = v.strip()
+
+        size = 0
+        if resp_headers.get("transfer-encoding", "").lower() == "chunked":
+            while True:
+                chunk_len = int((await self.reader.readline()).split(b";")[0], 16)
+                if chunk_len == 0:
+                    await self.reader.readline()
+                    break
+                size += len(await self.reader.readexactly(chunk_len))
+                await self.reader.readline()
+        elif "content-length" in resp_headers:
+            size = len(await self.reader.readexactly(int(resp_headers["content-length"])))
+        else:
+            size = len(await self.reader.read())
+            self.close()
+
+        if resp_headers.get("connection", "").lower() == "close":
+            self.close()
+        return status, size
+
+
+class EndpointStats:
+    def __init__(self):
+        self.latencies = []
+        self.errors = 0
+        self.bytes = 0
+
+    @property
+    def count(self):
+        return len(self.latencies)
+
+    def percentile(self, p):
+        if not self.latencies:
+            return 0.0
+        ordered = sorted(self.latencies)
+        # Nearest-rank percentile
+        idx = max(0, min(len(ordered) - 1, math.ceil(p / 100.0 * len(ordered)) - 1))
+        return ordered[idx]
+
+    def summary(self, elapsed):
+        return {
+            "requests": self.count,
+            "errors": self.errors,
+            "error_rate": self.errors / self.count if self.count else 0.0,
+            "throughput_rps": self.count / elapsed if elapsed else 0.0,
+            "bytes": self.bytes,
+            "p50_ms": self.percentile(50) * 1000,
+            "p95_ms": self.percentile(95) * 1000,
+            "p99_ms": self.percentile(99) * 1000,
+            "max_ms": max(self.latencies) * 1000 if self.latencies else 0.0,
+        }
+
+
+def parse_mix(spec):
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in ENDPOINTS:
+            raise argparse.ArgumentTypeError(f"unknown endpoint '{name}' (choose from {', '.join(ENDPOINTS)})")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+class LoadTest:
+    def __init__(self, base_url, mix, concurrency, rate, duration, total, timeout, seed, api_key):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.names = list(mix)
+        self.weights = [mix[n] for n in self.names]
+        self.concurrency = concurrency
+        self.rate = rate
+        self.duration = duration
+        self.total = total
+        self.timeout = timeout
+        self.api_key = api_key or ""
+        self.rng = random.Random(seed)
+        self.transcripts = itertools.cycle(TRANSCRIPTS)
+        self.stats = {name: EndpointStats() for name in self.names}
+        # Created in run(): before Python 3.10 asyncio queues bind to the loop
+        # that is current when they are built, not the one asyncio.run() starts
+        self.pool = None
+
+    def _next_call(self):
+        name = self.rng.choices(self.names, self.weights)[0]
+        method, path, needs_key, body_factory = ENDPOINTS[name]
+        headers = {"Content-Type": "application/json"}
+        if needs_key:
+            headers["X-API-KEY"] = self.api_key
+        body = json.dumps(body_factory(next(self.transcripts))).encode() if body_factory else None
+        return name, method, path, body, headers
+
+    async def _call(self, scheduled_at):
+        name, method, path, body, headers = self._next_call()
+        conn = await self.pool.get()
+        stats = self.stats[name]
+        try:
+            status, size = await conn.request(method, path, body, headers)
+            stats.bytes += size
+            if status >= 400:
+                stats.errors += 1
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError, IndexError):
+            conn.close()
+            stats.errors += 1
+        finally:
+            self.pool.put_nowait(conn)
+        # Measured from the scheduled start, so time spent queueing for a
+        # connection counts (avoids coordinated omission in --rate mode).
+        stats.latencies.append(time.perf_counter() - scheduled_at)
+
+    def _should_stop(self, started, issued):
+        if self.total is not None and issued >= self.total:
+            return True
+        return self.duration is not None and time.perf_counter() - started >= self.duration
+
+    async def _closed_loop(self, started):
+        issued = 0
+
+        async def worker():
+            nonlocal issued
+            while not self._should_stop(started, issued):
+                issued += 1
+                await self._call(time.perf_counter())
+
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+
+    async def _open_loop(self, started):
+        issued = 0
+        interval = 1.0 / self.rate
+        tasks = set()
+        while not self._should_stop(started, issued):
+            scheduled_at = started + issued * interval
+            delay = scheduled_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            task = asyncio.create_task(self._call(scheduled_at))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+            issued += 1
+        if tasks:
+            await asyncio.gather(*tasks)
+
+    async def run(self):
+        self.pool = asyncio.LifoQueue()
+        for _ in range(self.concurrency):
+            self.pool.put_nowait(Connection(self.host, self.port, self.timeout))
+
+        started = time.perf_counter()
+        if self.rate:
+            await self._open_loop(started)
+        else:
+            await self._closed_loop(started)
+        elapsed = time.perf_counter() - started
+
+        while not self.pool.empty():
+            self.pool.get_nowait().close()
+        return self.report(elapsed)
+
+    def report(self, elapsed):
+        overall = EndpointStats()
+        for s in self.stats.values():
+            overall.latencies.extend(s.latencies)
+            overall.errors += s.errors
+            overall.bytes += s.bytes
+        return {
+            "elapsed_s": elapsed,
+            "mode": f"rate={self.rate}/s" if self.rate else f"concurrency={self.concurrency}",
+            "concurrency": self.concurrency,
+            "endpoints": {name: s.summary(elapsed) for name, s in self.stats.items()},
+            "total": overall.summary(elapsed),
+        }
+
+
+def format_report(report):
+    header = f"{'endpoint':<10} {'reqs':>7} {'err%':>6} {'rps':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}"
+    lines = [
+        f"Ran {report['mode']} for {report['elapsed_s']:.1f}s",
+        header,
+        "-" * len(header),
+    ]
+    rows = list(report["endpoints"].items()) + [("TOTAL", report["total"])]
+    for name, s in rows:
+        lines.append(
+            f"{name:<10} {s['requests']:>7} {s['error_rate'] * 100:>5.1f}% {s['throughput_rps']:>8.1f} "
+            f"{s['p50_ms']:>9.1f} {s['p95_ms']:>9.1f} {s['p99_ms']:>9.1f} {s['max_ms']:>9.1f}"
+        )
+    return "\n".join(lines)
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(workers, db_dir, serve=False):
+    port = _free_port()
+    env = dict(os.environ)
+    env["DATABASE_URL"] = f"sqlite:///{os.path.join(db_dir, 'loadtest.db')}"
+    env["API_KEY"] = LOADTEST_API_KEY
+    if serve:
+        # Production entry point (gunicorn, preloaded app)
+        env.update({"HOST": "127.0.0.1", "PORT": str(port), "WEB_CONCURRENCY": str(workers)})
+        cmd = [sys.executable, "-m", "app.serve"]
+    else:
+        cmd = [
+            sys.executable, "-m", "uvicorn", "app.main:app",
+            "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(workers), "--log-level", "warning",
+        ]
+    proc = subprocess.Popen(cmd, cwd=ROOT_DIR, env=env)
+
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError("server exited during startup")
+        try:
+            # Wait for a worker to actually answer, not just for the bind
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=2)
+            conn.request("GET", "/")
+            conn.getresponse().read()
+            conn.close()
+            return proc, f"http://127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.2)
+    proc.terminate()
+    raise RuntimeError("server did not start within 30s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline load test for the proposal API.")
+    parser.add_argument("--base-url", help="target an already running server instead of starting one")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for the local server")
+    parser.add_argument("--serve", action="store_true", help="start the local server with python -m app.serve instead of plain uvicorn")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix(DEFAULT_MIX), help=f"weighted endpoint mix (default: {DEFAULT_MIX})")
+    parser.add_argument("--concurrency", type=int, default=8, help="in-flight requests (connection pool size)")
+    parser.add_argument("--rate", type=float, help="target requests/s (open loop); default is closed loop at --concurrency")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to run")
+    parser.add_argument("--requests", type=int, help="stop after this many requests instead of --duration")
+    parser.add_argument("--timeout", type=float, default=30.0, help="per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="also write the report as JSON to this path ('-' for stdout)")
+    args = parser.parse_args(argv)
+
+    proc = None
+    db_dir = None
+    base_url = args.base_url
+    if not base_url:
+        db_dir = tempfile.mkdtemp(prefix="loadtest-")
+        proc, base_url = start_server(args.workers, db_dir, serve=args.serve)
+        print(f"Started {'app.serve' if args.serve else 'uvicorn'} with {args.workers} worker(s) at {base_url}")
+
+    try:
+        test = LoadTest(
+            base_url,
+            args.mix,
+            concurrency=args.concurrency,
+            rate=args.rate,
+            duration=None if args.requests else args.duration,
+            total=args.requests,
+            timeout=args.timeout,
+            seed=args.seed,
+            api_key=LOADTEST_API_KEY if proc else os.getenv("API_KEY"),
+        )
+        report = asyncio.run(test.run())
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait(timeout=30)
+        if db_dir:
+            shutil.rmtree(db_dir, ignore_errors=True)
+
+    report["workers"] = args.workers if proc else None
+    print(format_report(report))
+    if args.json == "-":
+        print(json.dumps(report, indent=2))
+    elif args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote JSON report to {args.json}")
+
+
+if __name__ == "__main__":
+    main()